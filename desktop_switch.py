@@ -7,10 +7,121 @@ import tkinter as tk
 from tkinter import ttk
 import ctypes
 import ctypes.wintypes as wintypes
-import time
-import winreg
 import json
 import os
+import queue
+import sys
+import threading
+
+
+DEBUG = False  # Print per-event diagnostics (drag steps, desktop changes)
+
+REG_PATH = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\VirtualDesktops"
+# Predefined key handles are sign-extended on 64-bit Windows
+HKEY_CURRENT_USER = wintypes.HKEY(ctypes.c_long(0x80000001).value)
+KEY_NOTIFY = 0x0010
+KEY_READ = 0x20019
+REG_NOTIFY_CHANGE_LAST_SET = 0x00000004
+ERROR_SUCCESS = 0
+ERROR_FILE_NOT_FOUND = 2
+ERROR_MORE_DATA = 234
+INFINITE = 0xFFFFFFFF
+FALLBACK_INTERVAL_MS = 5000  # Safety-net refresh if a notification is missed
+SWITCH_STEP_DELAY_MS = 100  # Pause between desktop steps when switching
+DRAG_THRESHOLD_PX = 3  # Minimum cursor movement before a click becomes a drag
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+
+# Windows keyboard combination: Win + Ctrl + Arrow
+VK_LWIN = 0x5B
+VK_CONTROL = 0x11
+VK_LEFT = 0x25
+VK_RIGHT = 0x27
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', wintypes.LONG),
+                ('dy', wintypes.LONG),
+                ('mouseData', wintypes.DWORD),
+                ('dwFlags', wintypes.DWORD),
+                ('time', wintypes.DWORD),
+                ('dwExtraInfo', ctypes.c_size_t)]
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [('wVk', wintypes.WORD),
+                ('wScan', wintypes.WORD),
+                ('dwFlags', wintypes.DWORD),
+                ('time', wintypes.DWORD),
+                ('dwExtraInfo', ctypes.c_size_t)]
+
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [('uMsg', wintypes.DWORD),
+                ('wParamL', wintypes.WORD),
+                ('wParamH', wintypes.WORD)]
+
+
+class _INPUTUNION(ctypes.Union):
+    # Mouse and hardware variants are only needed for the correct union size
+    _fields_ = [('mi', MOUSEINPUT),
+                ('ki', KEYBDINPUT),
+                ('hi', HARDWAREINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _anonymous_ = ('u',)
+    _fields_ = [('type', wintypes.DWORD),
+                ('u', _INPUTUNION)]
+
+
+def key_input(vk, flags=0):
+    """
+    Builds a keyboard INPUT record for SendInput.
+    
+    Args:
+        vk (int): Virtual-key code
+        flags (int): KEYEVENTF_* flags (0 = key down)
+    
+    Returns:
+        INPUT: Keyboard input record
+    """
+    return INPUT(type=INPUT_KEYBOARD, ki=KEYBDINPUT(wVk=vk, dwFlags=flags))
+
+
+# user32 binding resolved once, with a prototype so ctypes doesn't guess argument types
+_user32 = ctypes.WinDLL('user32', use_last_error=True)
+_SendInput = _user32.SendInput
+_SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+_SendInput.restype = wintypes.UINT
+
+# Registry and event functions bound directly, values are read into reusable buffers
+_advapi32 = ctypes.WinDLL('advapi32', use_last_error=True)
+_RegOpenKeyExW = _advapi32.RegOpenKeyExW
+_RegOpenKeyExW.argtypes = [wintypes.HKEY, wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD,
+                           ctypes.POINTER(wintypes.HKEY)]
+_RegOpenKeyExW.restype = wintypes.LONG
+_RegQueryValueExW = _advapi32.RegQueryValueExW
+_RegQueryValueExW.argtypes = [wintypes.HKEY, wintypes.LPCWSTR, ctypes.c_void_p,
+                              ctypes.POINTER(wintypes.DWORD), ctypes.c_char_p,
+                              ctypes.POINTER(wintypes.DWORD)]
+_RegQueryValueExW.restype = wintypes.LONG
+_RegNotifyChangeKeyValue = _advapi32.RegNotifyChangeKeyValue
+_RegNotifyChangeKeyValue.argtypes = [wintypes.HKEY, wintypes.BOOL, wintypes.DWORD,
+                                     wintypes.HANDLE, wintypes.BOOL]
+_RegNotifyChangeKeyValue.restype = wintypes.LONG
+_RegCloseKey = _advapi32.RegCloseKey
+_RegCloseKey.argtypes = [wintypes.HKEY]
+_RegCloseKey.restype = wintypes.LONG
+
+_kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+_CreateEventW = _kernel32.CreateEventW
+_CreateEventW.argtypes = [ctypes.c_void_p, wintypes.BOOL, wintypes.BOOL, wintypes.LPCWSTR]
+_CreateEventW.restype = wintypes.HANDLE
+_WaitForSingleObject = _kernel32.WaitForSingleObject
+_WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+_WaitForSingleObject.restype = wintypes.DWORD
 
 
 class VirtualDesktopOverlay:
@@ -21,6 +132,12 @@ class VirtualDesktopOverlay:
         self.config_file = "desktop_switch_config.json"
         self.mode = "work"  # Modes: "work" or "inQuit"
         self.saved_alpha = 0.9  # Saved transparency for work mode
+        self._save_after_id = None  # Pending debounced config save
+        self._pending_config = None  # Config captured when the save was requested
+        
+        # Config files are written by a background worker, one pending save at most
+        self._save_q = queue.Queue(maxsize=1)
+        threading.Thread(target=self._save_worker, daemon=True).start()
         
         self.root = tk.Tk()
         self.root.title("Virtual Desktops")
@@ -31,6 +148,7 @@ class VirtualDesktopOverlay:
         
         # Load position and transparency from config
         config = self.load_config()
+        self._last_saved_cfg = config  # Skip writes that wouldn't change the file
         if config and 'alpha' in config:
             alpha = config['alpha']
             self.saved_alpha = alpha
@@ -41,13 +159,44 @@ class VirtualDesktopOverlay:
         
         self.root.attributes('-alpha', alpha)  # Set transparency
         
+        # Registry key is opened once and kept for the app lifetime
+        self._vd_key = self._open_desktop_key()
+        self._ids_buf = ctypes.create_string_buffer(4096)  # Grown on ERROR_MORE_DATA
+        self._current_buf = ctypes.create_string_buffer(16)  # One desktop GUID
+        self._cached_ids_blob = None
+        self._cached_current_guid = None
+        self._cached_count = 1
+        self._cached_current_index = 0
+        self._guid_to_index = {}
+        self._refresh_desktop_state()
+        
         # Automatically detect number of virtual desktops
         self.desktop_count = self.get_desktop_count()
         self.last_desktop_count = self.desktop_count
         print(f"Detected desktops: {self.desktop_count}")
         
-        # Calculate width dynamically (10px margin left + right)
-        width = 20 + (self.desktop_count * 43) + 20  # 43px per desktop button + 20px for close button
+        # Background color
+        self.root.configure(bg='#1e1e1e')
+        
+        # Drag & drop functionality
+        self.root.bind('<Button-1>', self.start_drag)
+        self.root.bind('<B1-Motion>', self.on_drag)
+        self.root.bind('<ButtonRelease-1>', self.end_drag)
+        
+        self.current_desktop = 0
+        self._switch_after_id = None  # Pending step of a desktop switch
+        self._pending_steps = 0
+        self._switch_direction = 0
+        self._step_inputs = None
+        self.buttons = []
+        self.button_frame = None  # Container of the desktop buttons
+        self._last_highlighted_index = -1  # Button currently shown as active
+        self.close_button = None  # Reference to close button
+        
+        self.create_ui()
+        
+        # Calculate width from the created buttons
+        width = self.get_window_width()
         height = 50
         screen_width = self.root.winfo_screenwidth()
         
@@ -62,85 +211,147 @@ class VirtualDesktopOverlay:
         
         self.root.geometry(f'{width}x{height}+{x}+{y}')
         
-        # Background color
-        self.root.configure(bg='#1e1e1e')
-        
-        # Drag & drop functionality
-        self.root.bind('<Button-1>', self.start_drag)
-        self.root.bind('<B1-Motion>', self.on_drag)
-        self.root.bind('<ButtonRelease-1>', self.end_drag)
-        
-        self.current_desktop = 0
-        self.buttons = []
-        self.close_button = None  # Reference to close button
-        
-        self.create_ui()
         self.update_current_desktop()
         
-        # Auto-refresh every 500ms (checks desktop count and active desktop)
+        # Refresh whenever Windows writes the VirtualDesktops key
+        self.root.bind('<<DesktopChanged>>', lambda e: self._refresh_and_update())
+        self._notify_event = _CreateEventW(None, False, False, None)
+        threading.Thread(target=self._watch_registry, daemon=True).start()
+        
+        # Periodic fallback refresh (checks desktop count and active desktop)
         self.auto_update()
     
-    def get_desktop_count(self):
+    def _open_desktop_key(self):
         """
-        Determines the number of virtual desktops by reading Windows Registry.
+        Opens the VirtualDesktops Registry key.
         
         Returns:
-            int: Number of virtual desktops, minimum 1
+            HKEY: Open key handle or None if the key is not available
         """
-        try:
-            reg_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\VirtualDesktops"
-            
-            try:
-                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, reg_path, 0, winreg.KEY_READ)
-                desktop_ids, _ = winreg.QueryValueEx(key, "VirtualDesktopIDs")
-                winreg.CloseKey(key)
-                
-                # Each desktop has a 16-byte GUID
-                count = len(desktop_ids) // 16
-                if count > 0:
-                    return count
-            except:
-                pass
-            
-            # Fallback: At least 1 desktop always exists
-            return 1
-            
-        except Exception as e:
-            print(f"Error determining desktop count: {e}")
-            return 2  # Fallback to 2 desktops
+        key = wintypes.HKEY()
+        result = _RegOpenKeyExW(HKEY_CURRENT_USER, REG_PATH, 0, KEY_NOTIFY | KEY_READ,
+                                ctypes.byref(key))
+        if result != ERROR_SUCCESS:
+            return None  # Key doesn't exist yet (e.g. no desktops created)
+        return key
     
-    def get_current_desktop_index(self):
+    def _close_desktop_key(self):
+        """Closes the VirtualDesktops Registry key if it is open."""
+        if self._vd_key is not None:
+            _RegCloseKey(self._vd_key)
+            self._vd_key = None
+    
+    def _query_value(self, name, buf):
         """
-        Determines the index of the currently active desktop from Windows Registry.
+        Reads a Registry value of the desktop key into a preallocated buffer.
+        
+        Args:
+            name (str): Name of the value
+            buf: ctypes char buffer receiving the data
         
         Returns:
-            int: Index of current desktop (0-based)
+            tuple: (Win32 result code, size of the data in bytes)
         """
+        size = wintypes.DWORD(ctypes.sizeof(buf))
+        result = _RegQueryValueExW(self._vd_key, name, None, None, buf, ctypes.byref(size))
+        return result, size.value
+    
+    def _refresh_desktop_state(self):
+        """
+        Reads desktop IDs and the current desktop from Windows Registry in one pass.
+        The IDs are only re-parsed when the raw value has changed.
+        """
+        if self._vd_key is None:
+            self._vd_key = self._open_desktop_key()
+            if self._vd_key is None:
+                return  # Keep cached values
+        
         try:
-            reg_path = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\VirtualDesktops"
-            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, reg_path, 0, winreg.KEY_READ)
+            result, size = self._query_value("VirtualDesktopIDs", self._ids_buf)
+            if result == ERROR_MORE_DATA:
+                # Grow buffer to the reported size and retry
+                self._ids_buf = ctypes.create_string_buffer(size)
+                result, size = self._query_value("VirtualDesktopIDs", self._ids_buf)
+            if result == ERROR_FILE_NOT_FOUND:
+                size = 0
+            elif result != ERROR_SUCCESS:
+                # Handle is unusable (e.g. key deleted), reopen on the next refresh
+                self._close_desktop_key()
+                raise ctypes.WinError(result)
             
-            # Read current desktop GUID
-            try:
-                current_desktop, _ = winreg.QueryValueEx(key, "CurrentVirtualDesktop")
-            except:
-                winreg.CloseKey(key)
-                return 0  # Fallback to first desktop
+            # Compare in place, bytes are only copied when the value changed
+            desktop_ids = memoryview(self._ids_buf).cast('B')[:size]
+            if desktop_ids != self._cached_ids_blob:
+                self._cached_ids_blob = desktop_ids = desktop_ids.tobytes()
+                # Each desktop has a 16-byte GUID, at least 1 desktop always exists
+                self._cached_count = max(len(desktop_ids) // 16, 1)
+                self._guid_to_index = {desktop_ids[i:i+16]: i // 16
+                                       for i in range(0, len(desktop_ids), 16)}
+                self._cached_current_guid = None  # Index must be looked up again
             
-            # Read all desktop IDs
-            desktop_ids, _ = winreg.QueryValueEx(key, "VirtualDesktopIDs")
-            winreg.CloseKey(key)
+            # Read current desktop GUID
+            result, size = self._query_value("CurrentVirtualDesktop", self._current_buf)
+            if result == ERROR_FILE_NOT_FOUND:
+                self._cached_current_index = 0  # Fallback to first desktop
+                self._cached_current_guid = None  # Index must be looked up again
+                return
+            elif result != ERROR_SUCCESS:
+                self._close_desktop_key()
+                raise ctypes.WinError(result)
             
-            # Find index by matching GUID
-            for i in range(0, len(desktop_ids), 16):
-                if desktop_ids[i:i+16] == current_desktop:
-                    return i // 16
+            current_desktop = memoryview(self._current_buf).cast('B')[:size]
+            if current_desktop == self._cached_current_guid:
+                return
+            self._cached_current_guid = current_desktop = current_desktop.tobytes()
             
-            return 0  # Fallback
+            # O(1) lookup, keep the last known index if the GUID isn't listed (yet)
+            # unless that desktop no longer exists
+            fallback = self._cached_current_index
+            if fallback >= self._cached_count:
+                fallback = 0
+            self._cached_current_index = self._guid_to_index.get(current_desktop, fallback)
             
         except Exception as e:
-            print(f"Error determining current desktop: {e}")
-            return self.current_desktop  # Keep current value
+            print(f"Error reading desktop state: {e}")
+    
+    def _watch_registry(self):
+        """
+        Background thread: blocks until the VirtualDesktops key changes and
+        notifies the Tk thread via a <<DesktopChanged>> virtual event.
+        """
+        while True:
+            key = self._vd_key
+            if key is None or _RegNotifyChangeKeyValue(
+                    key, False, REG_NOTIFY_CHANGE_LAST_SET,
+                    self._notify_event, True) != ERROR_SUCCESS:
+                # Key not available, the fallback refresh will try to reopen it
+                _WaitForSingleObject(self._notify_event, FALLBACK_INTERVAL_MS)
+                continue
+            
+            _WaitForSingleObject(self._notify_event, INFINITE)
+            
+            try:
+                self.root.event_generate('<<DesktopChanged>>', when='tail')
+            except (tk.TclError, RuntimeError):
+                break  # Window destroyed or main loop not running
+    
+    def get_desktop_count(self):
+        """
+        Returns the number of virtual desktops from the last Registry read.
+        
+        Returns:
+            int: Number of virtual desktops, minimum 1
+        """
+        return self._cached_count
+    
+    def get_current_desktop_index(self):
+        """
+        Returns the index of the active desktop from the last Registry read.
+        
+        Returns:
+            int: Index of current desktop (0-based)
+        """
+        return self._cached_current_index
     
     def load_config(self):
         """
@@ -150,26 +361,75 @@ class VirtualDesktopOverlay:
             dict: Configuration dictionary or None if file doesn't exist
         """
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+            with open(self.config_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass  # No config saved yet
         except Exception as e:
             print(f"Error loading config: {e}")
         return None
     
     def save_config(self):
-        """Saves current position and transparency to JSON file."""
+        """
+        Captures current position and transparency and schedules the save.
+        Successive calls within 500ms result in a single write.
+        """
+        # Capture now: quit mode may change the window before the timer fires
         try:
-            config = {
+            self._pending_config = {
                 'x': self.root.winfo_x(),
                 'y': self.root.winfo_y(),
-                'alpha': self.root.attributes('-alpha')
+                'alpha': self.saved_alpha
             }
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
-            print(f"Position and transparency saved: x={config['x']}, y={config['y']}, alpha={config['alpha']}")
         except Exception as e:
             print(f"Error saving config: {e}")
+            return
+        
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+        self._save_after_id = self.root.after(500, self._do_save_config)
+    
+    def flush_config(self):
+        """Writes a pending debounced config save immediately."""
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+            self._do_save_config()
+    
+    def _do_save_config(self):
+        """Hands the captured position and transparency to the save worker."""
+        self._save_after_id = None
+        config, self._pending_config = self._pending_config, None
+        
+        if config == self._last_saved_cfg:
+            return  # Nothing changed since the last save
+        self._last_saved_cfg = config
+        
+        # Latest wins: replace a save the worker hasn't picked up yet
+        try:
+            self._save_q.put_nowait(config)
+        except queue.Full:
+            try:
+                self._save_q.get_nowait()
+                self._save_q.task_done()
+            except queue.Empty:
+                pass
+            self._save_q.put_nowait(config)
+    
+    def _save_worker(self):
+        """Background thread: writes queued configs to the JSON file."""
+        while True:
+            config = self._save_q.get()
+            try:
+                # Write to a temp file and swap it in, a crash never leaves a partial file
+                tmp_file = self.config_file + '.tmp'
+                with open(tmp_file, 'w') as f:
+                    json.dump(config, f)
+                os.replace(tmp_file, self.config_file)
+                print(f"Position and transparency saved: x={config['x']}, y={config['y']}, alpha={config['alpha']}")
+            except Exception as e:
+                print(f"Error saving config: {e}")
+            finally:
+                self._save_q.task_done()
     
     def create_ui(self):
         """Creates the user interface with desktop buttons and close button."""
@@ -177,24 +437,41 @@ class VirtualDesktopOverlay:
         main_frame = tk.Frame(self.root, bg='#1e1e1e')
         main_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Desktop button style, the active desktop is a 'selected' state flag
+        # ('clam' theme, as the native Windows theme ignores button colors)
+        style = ttk.Style(self.root)
+        style.theme_use('clam')
+        # Bevel, border and focus colors override clam's light defaults
+        style.configure('Desktop.TButton',
+                        background='#3c3c3c',
+                        foreground='white',
+                        font=('Segoe UI', 10, 'bold'),
+                        relief=tk.RAISED,
+                        borderwidth=2,
+                        padding=1,
+                        lightcolor='#5a5a5a',
+                        darkcolor='#2a2a2a',
+                        bordercolor='#1e1e1e',
+                        focuscolor='#3c3c3c')
+        # Every state is mapped, so nothing falls through to clam's TButton map
+        style.map('Desktop.TButton',
+                  background=[('selected', '#0078d7'), ('pressed', '#2d2d2d'),
+                              ('active', '#4a4a4a'), ('disabled', '#3c3c3c')],
+                  foreground=[('disabled', '#8a8a8a')],
+                  lightcolor=[('selected', '#0078d7'), ('pressed', '#2d2d2d'),
+                              ('active', '#5a5a5a')],
+                  darkcolor=[('selected', '#005a9e'), ('pressed', '#2d2d2d'),
+                             ('active', '#2a2a2a')],
+                  focuscolor=[('selected', '#0078d7'), ('pressed', '#2d2d2d'),
+                              ('active', '#4a4a4a')],
+                  relief=[('selected', tk.SUNKEN), ('pressed', tk.SUNKEN)])
+        
         # Desktop buttons
-        button_frame = tk.Frame(main_frame, bg='#1e1e1e')
-        button_frame.pack(side=tk.LEFT)
+        self.button_frame = tk.Frame(main_frame, bg='#1e1e1e')
+        self.button_frame.pack(side=tk.LEFT)
         
         for i in range(self.desktop_count):
-            btn = tk.Button(button_frame, 
-                          text=str(i + 1),
-                          width=3,
-                          height=1,
-                          bg='#3c3c3c',
-                          fg='white',
-                          font=('Segoe UI', 10, 'bold'),
-                          relief=tk.RAISED,
-                          bd=2,
-                          cursor='hand2',
-                          command=lambda idx=i: self.on_desktop_button_click(idx))
-            btn.pack(side=tk.LEFT, padx=3)
-            self.buttons.append(btn)
+            self.add_desktop_button(i)
         
         # Close button
         self.close_button = tk.Button(main_frame,
@@ -210,6 +487,23 @@ class VirtualDesktopOverlay:
                              command=self.on_close_button_click)
         self.close_button.pack(side=tk.LEFT, padx=(5, 0))
     
+    def add_desktop_button(self, index):
+        """
+        Creates a desktop button and appends it to the button frame.
+        
+        Args:
+            index (int): Index of the desktop the button switches to
+        """
+        btn = ttk.Button(self.button_frame, 
+                       text=str(index + 1),
+                       width=3,
+                       style='Desktop.TButton',
+                       takefocus=False,
+                       cursor='hand2',
+                       command=lambda idx=index: self.on_desktop_button_click(idx))
+        btn.pack(side=tk.LEFT, padx=3)
+        self.buttons.append(btn)
+    
     def on_desktop_button_click(self, index):
         """
         Handler for desktop button clicks.
@@ -227,9 +521,11 @@ class VirtualDesktopOverlay:
             self.enter_quit_mode()
         else:  # inQuit mode
             print("Exiting application")
+            self.flush_config()
+            self._save_q.join()  # Wait until the worker has written it
+            self._close_desktop_key()
             self.root.quit()
             self.root.destroy()
-            import sys
             sys.exit(0)
     
     def enter_quit_mode(self):
@@ -237,8 +533,7 @@ class VirtualDesktopOverlay:
         print("Entering quit mode")
         self.mode = "inQuit"
         
-        # Remove transparency
-        self.saved_alpha = self.root.attributes('-alpha')
+        # Remove transparency (work mode value stays in saved_alpha)
         self.root.attributes('-alpha', 1.0)
         
         # Change close button to green question mark
@@ -274,9 +569,12 @@ class VirtualDesktopOverlay:
         self.drag_step_count = 0
         self.x = event.x
         self.y = event.y
+        self._last_applied_xy = (self.root.winfo_x(), self.root.winfo_y())
+        self._drag_origin = (event.x_root, event.y_root)
+        self._drag_active = False
         
         # Ignore clicks on buttons (they have their own handlers)
-        if event.widget.winfo_class() == 'Button':
+        if event.widget.winfo_class() in ('Button', 'TButton'):
             return
         
         # Exit quit mode when dragging window
@@ -290,18 +588,30 @@ class VirtualDesktopOverlay:
         Args:
             event: Tkinter event object containing mouse position
         """
+        # Ignore jitter until the cursor has moved past the threshold
+        if not self._drag_active:
+            dx = event.x_root - self._drag_origin[0]
+            dy = event.y_root - self._drag_origin[1]
+            if dx * dx + dy * dy < DRAG_THRESHOLD_PX * DRAG_THRESHOLD_PX:
+                return
+            self._drag_active = True
+        
         self.drag_step_count += 1
         
         # Calculate movement delta
         deltax = event.x - self.x
         deltay = event.y - self.y
         
-        print(f"Dragging: delta=({deltax}, {deltay}), step={self.drag_step_count}")
+        if DEBUG:
+            print(f"Dragging: delta=({deltax}, {deltay}), step={self.drag_step_count}")
         
-        # Move window
+        # Move window, skip if the position wouldn't change
         x = self.root.winfo_x() + deltax
         y = self.root.winfo_y() + deltay
+        if (x, y) == self._last_applied_xy:
+            return
         self.root.geometry(f"+{x}+{y}")
+        self._last_applied_xy = (x, y)
     
     def end_drag(self, event):
         """
@@ -316,55 +626,74 @@ class VirtualDesktopOverlay:
     def switch_desktop(self, index):
         """
         Switches to specified desktop by simulating Win+Ctrl+Arrow key combinations.
+        Steps are chained via Tk timers so the event loop never blocks.
         
         Args:
             index (int): Target desktop index (0-based)
         """
         try:
+            # Cancel a switch still in progress, current_desktop tracks its progress
+            if self._switch_after_id is not None:
+                self.root.after_cancel(self._switch_after_id)
+                self._switch_after_id = None
+            
             # Calculate how many steps we need to move
             steps = index - self.current_desktop
             
             if steps == 0:
                 return  # Already on the correct desktop
             
-            # Windows keyboard combination: Win + Ctrl + Arrow
-            VK_LWIN = 0x5B
-            VK_CONTROL = 0x11
-            VK_LEFT = 0x25
-            VK_RIGHT = 0x27
-            
-            # Determine direction
-            arrow_key = VK_RIGHT if steps > 0 else VK_LEFT
-            steps = abs(steps)
+            # Determine direction once, the step count follows from its sign
+            direction = 1 if steps > 0 else -1
+            arrow_key = VK_RIGHT if direction > 0 else VK_LEFT
+            self._switch_direction = direction
+            self._pending_steps = steps * direction
             
-            # Execute the steps
-            for _ in range(steps):
-                # Press keys
-                ctypes.windll.user32.keybd_event(VK_LWIN, 0, 0, 0)
-                time.sleep(0.02)
-                ctypes.windll.user32.keybd_event(VK_CONTROL, 0, 0, 0)
-                time.sleep(0.02)
-                ctypes.windll.user32.keybd_event(arrow_key, 0, 0, 0)
-                time.sleep(0.02)
-                
-                # Release keys
-                ctypes.windll.user32.keybd_event(arrow_key, 0, 2, 0)
-                time.sleep(0.02)
-                ctypes.windll.user32.keybd_event(VK_CONTROL, 0, 2, 0)
-                time.sleep(0.02)
-                ctypes.windll.user32.keybd_event(VK_LWIN, 0, 2, 0)
-                
-                # Brief pause between steps
-                time.sleep(0.1)
+            # Press and release keys, sent as one batch per step
+            self._step_inputs = (INPUT * 6)(
+                key_input(VK_LWIN),
+                key_input(VK_CONTROL),
+                key_input(arrow_key),
+                key_input(arrow_key, KEYEVENTF_KEYUP),
+                key_input(VK_CONTROL, KEYEVENTF_KEYUP),
+                key_input(VK_LWIN, KEYEVENTF_KEYUP))
             
-            # Update desktop index
-            self.current_desktop = index
+            self._emit_next_step()
             
-            # Update button display immediately
+        except Exception as e:
+            print(f"Error switching desktop: {e}")
+    
+    def _emit_next_step(self):
+        """Sends one Win+Ctrl+Arrow step and schedules the next one."""
+        self._switch_after_id = None
+        
+        if self._pending_steps == 0:
+            # Update button display once all steps are done
+            self._refresh_desktop_state()
             self.update_current_desktop()
-            
+            return
+        
+        try:
+            # One call injects the whole key combination atomically
+            sent = _SendInput(len(self._step_inputs), self._step_inputs, ctypes.sizeof(INPUT))
+            if sent != len(self._step_inputs):
+                # Input was blocked by another thread. UIPI blocking is not reported
+                # by the return value or the last error, so this can't detect it.
+                error = ctypes.get_last_error()
+                if error:
+                    raise ctypes.WinError(error)
+                raise OSError(f"SendInput sent {sent} of {len(self._step_inputs)} inputs")
         except Exception as e:
             print(f"Error switching desktop: {e}")
+            self._pending_steps = 0
+            return
+        
+        # Update desktop index
+        self.current_desktop += self._switch_direction
+        self._pending_steps -= 1
+        
+        # Brief pause between steps
+        self._switch_after_id = self.root.after(SWITCH_STEP_DELAY_MS, self._emit_next_step)
     
     def update_current_desktop(self):
         """Updates the visual indication of the currently active desktop."""
@@ -373,49 +702,78 @@ class VirtualDesktopOverlay:
         
         # If desktop changed, update display
         if detected_desktop != self.current_desktop:
-            print(f"Desktop change detected: {self.current_desktop} -> {detected_desktop}")
+            if DEBUG:
+                print(f"Desktop change detected: {self.current_desktop} -> {detected_desktop}")
             self.current_desktop = detected_desktop
         
-        # Update all buttons
-        for i, btn in enumerate(self.buttons):
-            if i == self.current_desktop:
-                btn.configure(bg='#0078d7', relief=tk.SUNKEN)
-            else:
-                btn.configure(bg='#3c3c3c', relief=tk.RAISED)
+        # Only reconfigure the buttons whose state changes
+        if self.current_desktop == self._last_highlighted_index:
+            return
+        
+        if 0 <= self._last_highlighted_index < len(self.buttons):
+            self.buttons[self._last_highlighted_index].state(['!selected'])
+        
+        if 0 <= self.current_desktop < len(self.buttons):
+            self.buttons[self.current_desktop].state(['selected'])
+            self._last_highlighted_index = self.current_desktop
+        else:
+            self._last_highlighted_index = -1
     
-    def auto_update(self):
-        """Automatically updates display and checks for desktop count changes."""
-        self.update_current_desktop()
+    def _refresh_and_update(self):
+        """Re-reads desktop state, updates display and checks for desktop count changes."""
+        self._refresh_desktop_state()
         
-        # Check every 500ms if number of desktops changed
+        # Check if number of desktops changed (before highlighting, so the button exists)
         new_count = self.get_desktop_count()
         if new_count != self.last_desktop_count:
-            print(f"Desktop count changed: {self.last_desktop_count} -> {new_count}")
+            if DEBUG:
+                print(f"Desktop count changed: {self.last_desktop_count} -> {new_count}")
             self.last_desktop_count = new_count
             self.desktop_count = new_count
             # Recreate UI with new button count
             self.recreate_ui()
         
-        self.root.after(500, self.auto_update)  # Update every 500ms for quick response
+        self.update_current_desktop()
+    
+    def auto_update(self):
+        """Fallback refresh in case a Registry change notification is missed."""
+        self._refresh_and_update()
+        self.root.after(FALLBACK_INTERVAL_MS, self.auto_update)
     
     def recreate_ui(self):
-        """Recreates the UI when the number of desktops changes."""
-        # Delete all widgets
-        for widget in self.root.winfo_children():
-            widget.destroy()
-        
-        # Clear button list
-        self.buttons = []
+        """Adds or removes desktop buttons when the number of desktops changes."""
+        delta = self.desktop_count - len(self.buttons)
+        
+        if delta > 0:
+            # Append buttons for new desktops
+            for i in range(len(self.buttons), self.desktop_count):
+                self.add_desktop_button(i)
+        elif delta < 0:
+            # Remove buttons of deleted desktops
+            for btn in self.buttons[delta:]:
+                btn.destroy()
+            self.buttons = self.buttons[:delta]
+            if self._last_highlighted_index >= len(self.buttons):
+                self._last_highlighted_index = -1
         
         # Adjust window width
-        width = 20 + (self.desktop_count * 43) + 20  # 43px per desktop button + 20px for close button
+        width = self.get_window_width()
         height = 50
         x = self.root.winfo_x()  # Keep current position
         y = self.root.winfo_y()
         self.root.geometry(f'{width}x{height}+{x}+{y}')
+    
+    def get_window_width(self):
+        """
+        Calculates the window width from the requested sizes of the buttons.
         
-        # Recreate UI
-        self.create_ui()
+        Returns:
+            int: Window width in pixels
+        """
+        # 3px padding left + right per desktop button, 5px before the close button,
+        # 5px frame margin left + right
+        buttons_width = sum(btn.winfo_reqwidth() + 6 for btn in self.buttons)
+        return 5 + buttons_width + 5 + self.close_button.winfo_reqwidth() + 5
     
     def run(self):
         """Starts the Tkinter main loop."""